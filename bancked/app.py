@@ -7,13 +7,22 @@ import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse, FileResponse
+from starlette.datastructures import Headers
 
 from config import settings
+from cache_events import cache_bus
 from database import cosmos_db
 from routes_auth import router as auth_router
 from routes_media import router as media_router
 from storage import blob_storage
+from utils import (
+    start_thumbnail_executor,
+    shutdown_thumbnail_executor,
+    start_logic_app_client,
+    close_logic_app_client,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -32,7 +41,10 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up Cloud Media Platform API...")
     try:
         cosmos_db.initialize()
-        blob_storage.initialize()
+        await blob_storage.initialize()
+        start_thumbnail_executor()
+        start_logic_app_client()
+        await cache_bus.start()
         logger.info("Azure services initialized successfully")
     except Exception as err:
         logger.error(f"Failed to initialize Azure services: {err}")
@@ -42,6 +54,10 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     logger.info("Shutting down Cloud Media Platform API...")
+    await cache_bus.stop()
+    await blob_storage.close()
+    shutdown_thumbnail_executor()
+    await close_logic_app_client()
 
 
 # Create FastAPI application
@@ -55,6 +71,44 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Allowance for multipart framing and form fields around the uploaded file
+UPLOAD_OVERHEAD_BYTES = 64 * 1024
+UPLOAD_PATH = "/api/media"
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject media uploads over the size limit from Content-Length before any
+    bytes are read; all other requests pass straight through
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "POST"
+            and scope["path"].rstrip("/") == UPLOAD_PATH
+        ):
+            content_length = Headers(scope=scope).get("content-length", "")
+            max_size = settings.max_file_size_bytes
+            if content_length.isdigit() and int(content_length) > max_size + UPLOAD_OVERHEAD_BYTES:
+                response = JSONResponse(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    content={
+                        "detail": f"Request size ({int(content_length) / (1024 * 1024):.2f} MB) exceeds maximum allowed size ({max_size / (1024 * 1024):.0f} MB)"
+                    },
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+
+# Reject oversized uploads (registered before CORS so errors carry CORS headers)
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -64,6 +118,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses (media list pages, frontend bundles)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 # Exception handlers
 @app.exception_handler(RequestValidationError)
@@ -0,0 +1,113 @@
+from redis.asyncio import Redis
+from typing import Optional, Set
+from config import settings
+from database import cosmos_db
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "media:invalidate"
+# Fail fast when Redis is unreachable instead of waiting on TCP timeouts
+REDIS_TIMEOUT_SECONDS = 1.0
+# How often an idle subscriber pings Redis to detect dead connections
+HEALTH_CHECK_INTERVAL_SECONDS = 30
+
+
+class CacheInvalidationBus:
+    """
+    Broadcasts media writes over Redis pub/sub so every worker evicts its
+    in-process Cosmos caches immediately instead of waiting for TTL expiry
+    """
+
+    def __init__(self):
+        self.redis: Optional[Redis] = None
+        self.subscriber: Optional[Redis] = None
+        self._listener: Optional[asyncio.Task] = None
+        # Strong refs to in-flight publishes so tasks aren't collected
+        self._pending_publishes: Set["asyncio.Task[None]"] = set()
+
+    async def start(self):
+        """Connect to Redis and start listening for invalidation events"""
+        if not settings.redis_url:
+            logger.warning("REDIS_URL is not configured, cache invalidation is local only")
+            return
+
+        self.redis = Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+            socket_timeout=REDIS_TIMEOUT_SECONDS,
+        )
+        # Pub/sub reads wait for messages, so no socket_timeout; periodic
+        # health checks detect dead connections instead
+        self.subscriber = Redis.from_url(
+            settings.redis_url,
+            decode_responses=True,
+            socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+            health_check_interval=HEALTH_CHECK_INTERVAL_SECONDS,
+        )
+        self._listener = asyncio.create_task(self._listen())
+        logger.info("Cache invalidation listener started")
+
+    async def stop(self):
+        """Stop listening and close the Redis connection"""
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+        for client in (self.redis, self.subscriber):
+            if client:
+                await client.aclose()
+        self.redis = None
+        self.subscriber = None
+
+    async def publish(self, user_id: str, media_id: str):
+        """Announce that a user's media item changed"""
+        if not self.redis:
+            return
+
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, f"{user_id}:{media_id}")
+        except Exception as e:
+            # Local caches are already invalidated; peers fall back to TTL
+            logger.error(f"Failed to publish cache invalidation: {e}")
+
+    def schedule_publish(self, user_id: str, media_id: str):
+        """Publish in the background; local caches are already invalidated"""
+        if not self.redis:
+            return
+
+        task = asyncio.create_task(self.publish(user_id, media_id))
+        self._pending_publishes.add(task)
+        task.add_done_callback(self._pending_publishes.discard)
+
+    async def _listen(self):
+        """Evict cache entries for every invalidation event, reconnecting on errors"""
+        while True:
+            try:
+                async with self.subscriber.pubsub() as pubsub:
+                    await pubsub.subscribe(INVALIDATION_CHANNEL)
+                    while True:
+                        # Bounded waits let the health check run when idle
+                        message = await pubsub.get_message(
+                            ignore_subscribe_messages=True,
+                            timeout=HEALTH_CHECK_INTERVAL_SECONDS,
+                        )
+                        if message is None:
+                            continue
+                        user_id, _, media_id = message["data"].partition(":")
+                        cosmos_db.invalidate_media(user_id, media_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener failed: {e}")
+                await asyncio.sleep(1)
+
+
+# Global instance
+cache_bus = CacheInvalidationBus()
@@ -26,6 +26,15 @@ class Settings(BaseSettings):
     max_file_size_mb: int = 100
     allowed_image_types: str = "image/jpeg,image/png,image/gif,image/webp"
     allowed_video_types: str = "video/mp4,video/mpeg,video/quicktime,video/webm"
+    # Thumbnail processes per API worker process
+    thumbnail_workers: int = 2
+
+    # Query Cache Configuration
+    media_list_cache_ttl_seconds: int = 30
+    media_search_cache_ttl_seconds: int = 10
+    media_doc_cache_ttl_seconds: int = 60
+    # Redis pub/sub for cross-worker cache invalidation (optional)
+    redis_url: Optional[str] = None
 
     # Logic App Configuration
     logic_app_url: Optional[str] = None
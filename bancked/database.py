@@ -1,11 +1,40 @@
+from azure.core import MatchConditions
 from azure.cosmos import CosmosClient, exceptions, PartitionKey
 from azure.cosmos.container import ContainerProxy
+from cachetools import TTLCache
 from typing import Optional, List, Dict, Any
 from config import settings
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields returned by list and search queries (everything MediaResponse needs)
+MEDIA_LIST_FIELDS = (
+    "id",
+    "userId",
+    "fileName",
+    "originalFileName",
+    "mediaType",
+    "fileSize",
+    "mimeType",
+    "blobUrl",
+    "thumbnailUrl",
+    "description",
+    "tags",
+    "uploadedAt",
+    "updatedAt",
+)
+MEDIA_LIST_SELECT = "SELECT " + ", ".join(f"m.{field}" for field in MEDIA_LIST_FIELDS)
+
+# Query cache bounds: users tracked, and cached queries per user
+MAX_CACHED_USERS = 1000
+MAX_CACHED_QUERIES_PER_USER = 100
+
+
+class InvalidContinuationToken(ValueError):
+    """Raised when Cosmos rejects a client-supplied continuation token"""
+
 
 class CosmosDBClient:
     def __init__(self):
@@ -13,6 +42,18 @@ class CosmosDBClient:
         self.database = None
         self.users_container = None
         self.media_container = None
+        # Short-lived caches for paginated media queries, nested as
+        # user_id -> {query key -> result} so a user is invalidated in one pop
+        self.media_list_cache = TTLCache(
+            maxsize=MAX_CACHED_USERS, ttl=settings.media_list_cache_ttl_seconds
+        )
+        self.media_search_cache = TTLCache(
+            maxsize=MAX_CACHED_USERS, ttl=settings.media_search_cache_ttl_seconds
+        )
+        # Media documents (including _etag) keyed by (user_id, media_id)
+        self.media_doc_cache = TTLCache(
+            maxsize=10000, ttl=settings.media_doc_cache_ttl_seconds
+        )
 
     def initialize(self):
         """Initialize database and containers"""
@@ -83,15 +124,25 @@ class CosmosDBClient:
     def create_media(self, media_data: dict) -> dict:
         """Create a new media item"""
         try:
-            return self.media_container.create_item(body=media_data)
+            created = self.media_container.create_item(body=media_data)
+            self.media_doc_cache[(created["userId"], created["id"])] = created
+            self.invalidate_user_media(created["userId"])
+            return created
         except exceptions.CosmosHttpResponseError as e:
             logger.error(f"Failed to create media: {e}")
             raise
 
     def get_media_by_id(self, media_id: str, user_id: str) -> Optional[dict]:
         """Get media by ID"""
+        cache_key = (user_id, media_id)
+        cached = self.media_doc_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
-            return self.media_container.read_item(item=media_id, partition_key=user_id)
+            media = self.media_container.read_item(item=media_id, partition_key=user_id)
+            self.media_doc_cache[cache_key] = media
+            return media
         except exceptions.CosmosResourceNotFoundError:
             return None
         except exceptions.CosmosHttpResponseError as e:
@@ -104,11 +155,21 @@ class CosmosDBClient:
         page: int = 1,
         page_size: int = 20,
         media_type: Optional[str] = None,
-    ) -> tuple[List[dict], int]:
-        """Get paginated list of user's media"""
+        continuation_token: Optional[str] = None,
+    ) -> tuple[List[dict], int, Optional[str]]:
+        """
+        Get paginated list of user's media
+        Raises InvalidContinuationToken if Cosmos rejects the token
+        Returns: (items, total, next_continuation_token)
+        """
+        cache_key = (page, page_size, media_type, continuation_token)
+        cached = self._get_cached_query(self.media_list_cache, user_id, cache_key)
+        if cached is not None:
+            return cached
+
         try:
             # Build query
-            query = "SELECT * FROM media m WHERE m.userId = @userId"
+            query = f"{MEDIA_LIST_SELECT} FROM media m WHERE m.userId = @userId"
             parameters = [{"name": "@userId", "value": user_id}]
 
             if media_type:
@@ -118,7 +179,7 @@ class CosmosDBClient:
             query += " ORDER BY m.uploadedAt DESC"
 
             # Get total count
-            count_query = query.replace("SELECT *", "SELECT VALUE COUNT(1)")
+            count_query = query.replace(MEDIA_LIST_SELECT, "SELECT VALUE COUNT(1)")
             count_result = list(
                 self.media_container.query_items(
                     query=count_query, parameters=parameters
@@ -126,15 +187,33 @@ class CosmosDBClient:
             )
             total = count_result[0] if count_result else 0
 
-            # Apply pagination
-            offset = (page - 1) * page_size
-            query += f" OFFSET {offset} LIMIT {page_size}"
+            if continuation_token or page == 1:
+                # Resume from the previous page; RU cost is flat for any depth
+                pager = self.media_container.query_items(
+                    query=query, parameters=parameters, max_item_count=page_size
+                ).by_page(continuation_token)
+                try:
+                    items = list(next(pager, []))
+                except exceptions.CosmosHttpResponseError as e:
+                    # Cosmos rejects malformed, expired or mismatched tokens
+                    if continuation_token and e.status_code == 400:
+                        raise InvalidContinuationToken("Invalid continuation token")
+                    raise
+                next_token = pager.continuation_token
+            else:
+                # OFFSET makes Cosmos read and discard every skipped item
+                offset = (page - 1) * page_size
+                query += f" OFFSET {offset} LIMIT {page_size}"
+
+                items = list(
+                    self.media_container.query_items(query=query, parameters=parameters)
+                )
+                next_token = None
 
-            items = list(
-                self.media_container.query_items(query=query, parameters=parameters)
+            self._set_cached_query(
+                self.media_list_cache, user_id, cache_key, (items, total, next_token)
             )
-
-            return items, total
+            return items, total, next_token
 
         except exceptions.CosmosHttpResponseError as e:
             logger.error(f"Failed to get user media: {e}")
@@ -142,29 +221,52 @@ class CosmosDBClient:
 
     def update_media(self, media_id: str, user_id: str, updates: dict) -> dict:
         """Update media metadata"""
+        cache_key = (user_id, media_id)
         try:
-            # Get existing item
-            existing = self.get_media_by_id(media_id, user_id)
-            if not existing:
-                raise ValueError("Media not found")
-
-            # Update fields
-            existing.update(updates)
-
-            # Save updated item
-            return self.media_container.replace_item(
-                item=media_id, body=existing
-            )
+            try:
+                updated = self._replace_media(media_id, user_id, updates)
+            except exceptions.CosmosAccessConditionFailedError:
+                # Cached copy was stale; reload and retry once
+                self.media_doc_cache.pop(cache_key, None)
+                updated = self._replace_media(media_id, user_id, updates)
+
+            self.media_doc_cache[cache_key] = updated
+            self.invalidate_user_media(user_id)
+            return updated
+        except exceptions.CosmosResourceNotFoundError:
+            self.media_doc_cache.pop(cache_key, None)
+            raise ValueError("Media not found")
         except exceptions.CosmosHttpResponseError as e:
             logger.error(f"Failed to update media: {e}")
             raise
 
-    def delete_media(self, media_id: str, user_id: str) -> bool:
-        """Delete media item"""
+    def _replace_media(self, media_id: str, user_id: str, updates: dict) -> dict:
+        """Apply updates to the current document, guarded by its ETag"""
+        existing = self.get_media_by_id(media_id, user_id)
+        if not existing:
+            raise ValueError("Media not found")
+
+        # Update fields on a copy so the cached document stays untouched
+        body = {**existing, **updates}
+
+        return self.media_container.replace_item(
+            item=media_id,
+            body=body,
+            etag=existing["_etag"],
+            match_condition=MatchConditions.IfNotModified,
+        )
+
+    async def delete_media(self, media_id: str, user_id: str) -> bool:
+        """Delete media item without blocking the event loop"""
         try:
-            self.media_container.delete_item(item=media_id, partition_key=user_id)
+            await asyncio.to_thread(
+                self.media_container.delete_item, item=media_id, partition_key=user_id
+            )
+            self.media_doc_cache.pop((user_id, media_id), None)
+            self.invalidate_user_media(user_id)
             return True
         except exceptions.CosmosResourceNotFoundError:
+            self.media_doc_cache.pop((user_id, media_id), None)
             return False
         except exceptions.CosmosHttpResponseError as e:
             logger.error(f"Failed to delete media: {e}")
@@ -174,10 +276,15 @@ class CosmosDBClient:
         self, user_id: str, query: str, page: int = 1, page_size: int = 20
     ) -> tuple[List[dict], int]:
         """Search media by filename, description, or tags"""
+        cache_key = (page, page_size, query)
+        cached = self._get_cached_query(self.media_search_cache, user_id, cache_key)
+        if cached is not None:
+            return cached
+
         try:
             # Build search query
-            search_query = """
-                SELECT * FROM media m
+            search_query = f"""
+                {MEDIA_LIST_SELECT} FROM media m
                 WHERE m.userId = @userId
                 AND (
                     CONTAINS(LOWER(m.originalFileName), LOWER(@query))
@@ -192,7 +299,9 @@ class CosmosDBClient:
             ]
 
             # Get total count
-            count_query = search_query.replace("SELECT *", "SELECT VALUE COUNT(1)")
+            count_query = search_query.replace(
+                MEDIA_LIST_SELECT, "SELECT VALUE COUNT(1)"
+            )
             count_result = list(
                 self.media_container.query_items(
                     query=count_query, parameters=parameters
@@ -210,12 +319,43 @@ class CosmosDBClient:
                 )
             )
 
+            self._set_cached_query(
+                self.media_search_cache, user_id, cache_key, (items, total)
+            )
             return items, total
 
         except exceptions.CosmosHttpResponseError as e:
             logger.error(f"Failed to search media: {e}")
             raise
 
+    def invalidate_user_media(self, user_id: str):
+        """Drop cached list and search results for a user"""
+        self.media_list_cache.pop(user_id, None)
+        self.media_search_cache.pop(user_id, None)
+
+    @staticmethod
+    def _get_cached_query(cache: TTLCache, user_id: str, key: tuple):
+        """Look up a cached query result for a user"""
+        user_cache = cache.get(user_id)
+        return user_cache.get(key) if user_cache is not None else None
+
+    @staticmethod
+    def _set_cached_query(cache: TTLCache, user_id: str, key: tuple, value):
+        """
+        Cache a query result for a user
+        Entries never outlive the TTL: the per-user cache expires as a whole
+        """
+        user_cache = cache.get(user_id)
+        if user_cache is None:
+            user_cache = TTLCache(maxsize=MAX_CACHED_QUERIES_PER_USER, ttl=cache.ttl)
+            cache[user_id] = user_cache
+        user_cache[key] = value
+
+    def invalidate_media(self, user_id: str, media_id: str):
+        """Drop a cached media document and the user's cached queries"""
+        self.media_doc_cache.pop((user_id, media_id), None)
+        self.invalidate_user_media(user_id)
+
 
 # Global instance
 cosmos_db = CosmosDBClient()
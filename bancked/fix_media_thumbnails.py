@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+为旧的媒体记录回填 thumbnailBlobName 字段
+"""
+import sys
+import logging
+from urllib.parse import urlparse, unquote
+from config import settings
+from database import cosmos_db
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def blob_name_from_url(blob_url: str) -> str:
+    """从 blob URL（可带 SAS）中解析出 blob 名称"""
+    path = unquote(urlparse(blob_url).path).lstrip("/")
+    prefix = f"{settings.blob_container_name}/"
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+def backfill_thumbnails(dry_run: bool = False):
+    """回填缺少 thumbnailBlobName 的媒体记录"""
+    logger.info("=" * 60)
+    logger.info("回填缩略图 blob 名称...")
+    logger.info("=" * 60)
+
+    try:
+        # 初始化数据库
+        cosmos_db.initialize()
+
+        # 查询有缩略图但缺少 thumbnailBlobName 的记录
+        query = (
+            "SELECT * FROM media m "
+            "WHERE IS_DEFINED(m.thumbnailUrl) AND NOT IS_NULL(m.thumbnailUrl) "
+            "AND NOT IS_DEFINED(m.thumbnailBlobName)"
+        )
+        items = list(
+            cosmos_db.media_container.query_items(
+                query=query, enable_cross_partition_query=True
+            )
+        )
+
+        logger.info(f"\n找到 {len(items)} 条需要回填的记录\n")
+
+        for media in items:
+            thumb_blob_name = blob_name_from_url(media["thumbnailUrl"])
+            logger.info(f"媒体: {media.get('id', '未知')}")
+            logger.info(f"  缩略图 blob: {thumb_blob_name}")
+
+            if dry_run:
+                continue
+
+            media["thumbnailBlobName"] = thumb_blob_name
+            cosmos_db.media_container.replace_item(item=media["id"], body=media)
+            logger.info(f"  ✓ 已更新")
+
+        return True
+
+    except Exception as e:
+        logger.error(f"回填失败: {e}", exc_info=True)
+        return False
+
+
+if __name__ == "__main__":
+    dry_run = len(sys.argv) > 1 and sys.argv[1] == "--dry-run"
+    success = backfill_thumbnails(dry_run=dry_run)
+    sys.exit(0 if success else 1)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, EmailStr, Field, RootModel, validator
 from typing import Optional, List
 from datetime import datetime
 
@@ -44,6 +44,10 @@ class MediaBase(BaseModel):
     tags: Optional[List[str]] = None
 
 
+class TagList(RootModel[List[str]]):
+    pass
+
+
 class MediaCreate(MediaBase):
     pass
 
@@ -88,8 +92,10 @@ class MediaInDB(BaseModel):
 class MediaListResponse(BaseModel):
     items: List[MediaResponse]
     total: int
-    page: int
+    # None when paging with continuation tokens
+    page: Optional[int] = None
     page_size: int = Field(alias="pageSize")
+    next_page_token: Optional[str] = Field(None, alias="nextPageToken")
 
     class Config:
         populate_by_name = True
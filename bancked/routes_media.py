@@ -1,20 +1,75 @@
 # 风格：命名抽象化 + 轻微表达式改写 | 布局：保持接口不变 | 命名：content_flavor + label_bundle + artifact_record
 from fastapi import APIRouter, HTTPException, status, Depends, UploadFile, File, Form, Query
-from typing import Optional, List
-from models import MediaResponse, MediaUpdate, MediaListResponse
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter, ValidationError
+from typing import Optional, List, Literal
+from models import MediaResponse, MediaUpdate, MediaListResponse, TagList
 from auth import get_current_user_id
-from database import cosmos_db
+from database import cosmos_db, InvalidContinuationToken
+from cache_events import cache_bus
 from storage import blob_storage
-from utils import validate_file_type, validate_file_size, generate_thumbnail, notify_logic_app
-from datetime import datetime
-import uuid
-import json
+from utils import (
+    validate_file_type,
+    validate_file_size,
+    generate_thumbnail_async,
+    schedule_logic_app_notification,
+    utc_timestamp,
+    generate_uuid,
+)
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/media", tags=["Media Management"])
 
+# Validates a whole page of Cosmos documents in a single pydantic-core call
+_media_list_adapter = TypeAdapter(List[MediaResponse])
+
+
+async def _upload_thumbnail(
+    raw_buffer: bytes, user_id: str, original_filename: str
+) -> tuple[Optional[str], Optional[str]]:
+    """
+    Generate and upload a thumbnail
+    Returns: (blob_name, blob_url), or (None, None) if failed
+    """
+    try:
+        thumb_bytes = await generate_thumbnail_async(raw_buffer)
+    except Exception as e:
+        logger.warning(f"Failed to generate thumbnail: {e}")
+        return None, None
+
+    if not thumb_bytes:
+        return None, None
+
+    try:
+        return await blob_storage.upload_file(
+            thumb_bytes,
+            user_id,
+            f"thumb_{original_filename}",
+            "image/jpeg",
+        )
+    except Exception as e:
+        logger.warning(f"Failed to upload thumbnail: {e}")
+        return None, None
+
+
+async def _discard_thumbnail(
+    thumb_task: "asyncio.Task[tuple[Optional[str], Optional[str]]]",
+) -> None:
+    """
+    Cancel a pending thumbnail upload, or delete its blob if it already finished
+    """
+    thumb_task.cancel()
+    try:
+        thumb_handle, _ = await thumb_task
+    except asyncio.CancelledError:
+        return
+
+    if thumb_handle:
+        await blob_storage.delete_file(thumb_handle)
+
 
 @router.post("", response_model=MediaResponse, status_code=status.HTTP_201_CREATED)
 async def upload_media(
@@ -27,7 +82,7 @@ async def upload_media(
     Upload a new image or video file
     """
     # Notify Logic App
-    await notify_logic_app()
+    schedule_logic_app_notification()
 
     try:
         # Validate file type
@@ -40,44 +95,49 @@ async def upload_media(
         label_bundle = None
         if tags:
             try:
-                label_bundle = json.loads(tags)
-                if not isinstance(label_bundle, list):
-                    raise ValueError("Tags must be an array")
-            except json.JSONDecodeError:
+                label_bundle = TagList.model_validate_json(tags).root
+            except ValidationError:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid tags format. Must be a JSON array.",
+                    detail="Invalid tags format. Must be a JSON array of strings.",
                 )
 
-        # Read file content
-        raw_buffer = await file.read()
-        await file.seek(0)
+        # Only images are read into memory (for the thumbnail); other files
+        # stream straight from the spooled upload
+        if content_flavor == "image":
+            raw_buffer = await file.read()
+            upload_source = raw_buffer
+        else:
+            upload_source = file.file
 
         # Upload to blob storage
-        blob_handle, blob_pointer = blob_storage.upload_file(
-            file.file, user_id, file.filename, file.content_type
+        main_upload = blob_storage.upload_file(
+            upload_source,
+            user_id,
+            file.filename,
+            file.content_type,
+            length=payload_size,
         )
 
-        # Generate thumbnail for images
-        thumb_pointer = None
+        # Generate and upload thumbnail for images alongside the original;
+        # drop it if the original fails so no unreferenced blob is left
+        thumb_handle, thumb_pointer = None, None
         if content_flavor == "image":
-            thumb_bytes = generate_thumbnail(raw_buffer)
-            if thumb_bytes:
-                try:
-                    import io
-                    thumb_stream = io.BytesIO(thumb_bytes)
-                    _, thumb_pointer = blob_storage.upload_file(
-                        thumb_stream,
-                        user_id,
-                        f"thumb_{file.filename}",
-                        "image/jpeg",
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to upload thumbnail: {e}")
+            thumb_task = asyncio.create_task(
+                _upload_thumbnail(raw_buffer, user_id, file.filename)
+            )
+            try:
+                blob_handle, blob_pointer = await main_upload
+            except BaseException:
+                await _discard_thumbnail(thumb_task)
+                raise
+            thumb_handle, thumb_pointer = await thumb_task
+        else:
+            blob_handle, blob_pointer = await main_upload
 
         # Create media document
-        artifact_id = str(uuid.uuid4())
-        timestamp_now = datetime.utcnow().isoformat()
+        artifact_id = generate_uuid()
+        timestamp_now = utc_timestamp()
         artifact_record = {
             "id": artifact_id,
             "userId": user_id,
@@ -88,6 +148,7 @@ async def upload_media(
             "mimeType": file.content_type,
             "blobUrl": blob_pointer,
             "thumbnailUrl": thumb_pointer,
+            "thumbnailBlobName": thumb_handle,
             "description": description,
             "tags": label_bundle,
             "uploadedAt": timestamp_now,
@@ -96,9 +157,10 @@ async def upload_media(
 
         # Save to database
         created_record = cosmos_db.create_media(artifact_record)
+        cache_bus.schedule_publish(user_id, artifact_id)
 
         # Return response
-        return MediaResponse(**created_record)
+        return MediaResponse.model_validate(created_record)
 
     except HTTPException:
         raise
@@ -110,7 +172,12 @@ async def upload_media(
         )
 
 
-@router.get("/search", response_model=MediaListResponse, status_code=status.HTTP_200_OK)
+@router.get(
+    "/search",
+    response_model=MediaListResponse,
+    response_class=ORJSONResponse,
+    status_code=status.HTTP_200_OK,
+)
 async def search_media(
     query: str = Query(..., min_length=1),
     page: int = Query(1, ge=1),
@@ -121,14 +188,14 @@ async def search_media(
     Search media files by filename, description, or tags
     """
     # Notify Logic App
-    await notify_logic_app()
+    schedule_logic_app_notification()
 
     try:
         items, total = cosmos_db.search_media(
             user_id=user_id, query=query, page=page, page_size=pageSize
         )
 
-        shaped_items = [MediaResponse(**item) for item in items]
+        shaped_items = _media_list_adapter.validate_python(items)
 
         return MediaListResponse(
             items=shaped_items, total=total, page=page, pageSize=pageSize
@@ -142,30 +209,61 @@ async def search_media(
         )
 
 
-@router.get("", response_model=MediaListResponse, status_code=status.HTTP_200_OK)
+@router.get(
+    "",
+    response_model=MediaListResponse,
+    response_class=ORJSONResponse,
+    status_code=status.HTTP_200_OK,
+)
 async def get_media_list(
-    page: int = Query(1, ge=1),
+    page: Optional[int] = Query(
+        None,
+        ge=1,
+        description="Page number (default 1) for random access; deep pages are expensive, prefer continuation",
+    ),
     pageSize: int = Query(20, ge=1, le=100),
-    mediaType: Optional[str] = Query(None, regex="^(image|video)$"),
+    mediaType: Optional[Literal["image", "video"]] = Query(None),
+    continuation: Optional[str] = Query(
+        None, description="nextPageToken from the previous response"
+    ),
     user_id: str = Depends(get_current_user_id),
 ):
     """
     Retrieve paginated list of user's media files
     """
     # Notify Logic App
-    await notify_logic_app()
+    schedule_logic_app_notification()
+
+    if continuation and page is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="page cannot be combined with continuation",
+        )
 
     try:
-        items, total = cosmos_db.get_user_media(
-            user_id=user_id, page=page, page_size=pageSize, media_type=mediaType
+        items, total, next_token = cosmos_db.get_user_media(
+            user_id=user_id,
+            page=page or 1,
+            page_size=pageSize,
+            media_type=mediaType,
+            continuation_token=continuation,
         )
 
-        shaped_items = [MediaResponse(**item) for item in items]
+        shaped_items = _media_list_adapter.validate_python(items)
 
+        # Token pages have no page number
         return MediaListResponse(
-            items=shaped_items, total=total, page=page, pageSize=pageSize
+            items=shaped_items,
+            total=total,
+            page=None if continuation else page or 1,
+            pageSize=pageSize,
+            nextPageToken=next_token,
         )
 
+    except InvalidContinuationToken as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Get media list error: {e}")
         raise HTTPException(
@@ -183,7 +281,7 @@ async def get_media_by_id(
     Retrieve details of a specific media file
     """
     # Notify Logic App
-    await notify_logic_app()
+    schedule_logic_app_notification()
 
     try:
         media_record = cosmos_db.get_media_by_id(media_id, user_id)
@@ -200,7 +298,7 @@ async def get_media_by_id(
                 detail="You don't have permission to access this media",
             )
 
-        return MediaResponse(**media_record)
+        return MediaResponse.model_validate(media_record)
 
     except HTTPException:
         raise
@@ -222,7 +320,7 @@ async def update_media_metadata(
     Update description and tags of a media file
     """
     # Notify Logic App
-    await notify_logic_app()
+    schedule_logic_app_notification()
 
     try:
         # Get existing media
@@ -241,7 +339,7 @@ async def update_media_metadata(
             )
 
         # Prepare updates
-        changeset = {"updatedAt": datetime.utcnow().isoformat()}
+        changeset = {"updatedAt": utc_timestamp()}
 
         if update_data.description is not None:
             changeset["description"] = update_data.description
@@ -251,8 +349,9 @@ async def update_media_metadata(
 
         # Update in database
         patched_entry = cosmos_db.update_media(media_id, user_id, changeset)
+        cache_bus.schedule_publish(user_id, media_id)
 
-        return MediaResponse(**patched_entry)
+        return MediaResponse.model_validate(patched_entry)
 
     except HTTPException:
         raise
@@ -277,7 +376,7 @@ async def delete_media(
     Delete a media file and its metadata
     """
     # Notify Logic App
-    await notify_logic_app()
+    schedule_logic_app_notification()
 
     try:
         # Get existing media
@@ -295,23 +394,29 @@ async def delete_media(
                 detail="You don't have permission to delete this media",
             )
 
-        # Delete from blob storage
-        blob_storage.delete_file(stored_entry["fileName"])
+        # Delete from database and blob storage concurrently
+        deletions = [
+            cosmos_db.delete_media(media_id, user_id),
+            blob_storage.delete_file(stored_entry["fileName"]),
+        ]
 
         # Delete thumbnail if exists
-        if stored_entry.get("thumbnailUrl"):
-            # Extract blob name from thumbnail URL
-            try:
-                thumb_blob_name = stored_entry["fileName"].replace(
-                    stored_entry["originalFileName"].split("/")[-1],
-                    f"thumb_{stored_entry['originalFileName'].split('/')[-1]}",
-                )
-                blob_storage.delete_file(thumb_blob_name)
-            except Exception as e:
-                logger.warning(f"Failed to delete thumbnail: {e}")
+        thumb_blob_name = stored_entry.get("thumbnailBlobName")
+        if thumb_blob_name:
+            deletions.append(blob_storage.delete_file(thumb_blob_name))
+
+        db_result, *blob_results = await asyncio.gather(
+            *deletions, return_exceptions=True
+        )
+        for blob_result in blob_results:
+            if isinstance(blob_result, Exception):
+                logger.warning(f"Failed to delete blob: {blob_result}")
+
+        # Only a failed metadata delete fails the request
+        if isinstance(db_result, Exception):
+            raise db_result
 
-        # Delete from database
-        cosmos_db.delete_media(media_id, user_id)
+        cache_bus.schedule_publish(user_id, media_id)
 
         return None
 
@@ -1,10 +1,11 @@
-from azure.storage.blob import BlobServiceClient, generate_blob_sas, BlobSasPermissions, ContentSettings
+from azure.storage.blob import generate_blob_sas, BlobSasPermissions, ContentSettings
+from azure.storage.blob.aio import BlobServiceClient
 from datetime import datetime, timedelta
-from typing import Optional, BinaryIO
+from typing import Optional, BinaryIO, Union
 from config import settings
+from utils import generate_uuid
 import logging
 import os
-import uuid
 
 logger = logging.getLogger(__name__)
 
@@ -17,15 +18,15 @@ class BlobStorageClient:
         self.container_name = settings.blob_container_name
         self.container_client = None
 
-    def initialize(self):
+    async def initialize(self):
         """Initialize blob container"""
         try:
             # Create container if it doesn't exist
             self.container_client = (
                 self.blob_service_client.get_container_client(self.container_name)
             )
-            if not self.container_client.exists():
-                self.container_client.create_container()
+            if not await self.container_client.exists():
+                await self.container_client.create_container()
                 logger.info(f"Container '{self.container_name}' created")
             else:
                 logger.info(f"Container '{self.container_name}' already exists")
@@ -33,18 +34,28 @@ class BlobStorageClient:
             logger.error(f"Failed to initialize blob storage: {e}")
             raise
 
-    def upload_file(
-        self, file: BinaryIO, user_id: str, original_filename: str, content_type: str
+    async def close(self):
+        """Close the underlying async transport"""
+        await self.blob_service_client.close()
+
+    async def upload_file(
+        self,
+        data: Union[bytes, BinaryIO],
+        user_id: str,
+        original_filename: str,
+        content_type: str,
+        length: Optional[int] = None,
     ) -> tuple[str, str]:
         """
         Upload file to blob storage
+        Streams are uploaded in parallel blocks; pass length when known
         Returns: (blob_name, blob_url)
         """
         try:
             # Generate unique filename
             file_extension = os.path.splitext(original_filename)[1]
             timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-            unique_id = str(uuid.uuid4())[:8]
+            unique_id = generate_uuid()[:8]
             blob_name = f"{user_id}/{timestamp}_{unique_id}{file_extension}"
 
             # Upload to blob storage
@@ -52,10 +63,12 @@ class BlobStorageClient:
                 container=self.container_name, blob=blob_name
             )
 
-            blob_client.upload_blob(
-                file,
+            await blob_client.upload_blob(
+                data,
+                length=length,
                 content_settings=ContentSettings(content_type=content_type),
                 overwrite=True,
+                max_concurrency=8,
             )
 
             # Generate URL with SAS token
@@ -68,13 +81,13 @@ class BlobStorageClient:
             logger.error(f"Failed to upload file: {e}")
             raise
 
-    def delete_file(self, blob_name: str) -> bool:
+    async def delete_file(self, blob_name: str) -> bool:
         """Delete file from blob storage"""
         try:
             blob_client = self.blob_service_client.get_blob_client(
                 container=self.container_name, blob=blob_name
             )
-            blob_client.delete_blob()
+            await blob_client.delete_blob()
             logger.info(f"File deleted successfully: {blob_name}")
             return True
         except Exception as e:
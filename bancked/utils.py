@@ -1,13 +1,41 @@
 from fastapi import UploadFile, HTTPException, status
 from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+from datetime import datetime, timezone
+import asyncio
 import io
-from typing import Optional
+import multiprocessing
+import os
+import secrets
+import uuid
+from typing import Deque, Optional, Set
 from config import settings
 import logging
 import httpx
 
 logger = logging.getLogger(__name__)
 
+# Process pool for CPU-bound image work, started by the app lifespan
+_thumbnail_executor: Optional[ProcessPoolExecutor] = None
+
+# Background Logic App notifications (strong refs so tasks aren't collected)
+MAX_CONCURRENT_NOTIFICATIONS = 100
+_pending_notifications: Set["asyncio.Task[None]"] = set()
+_notification_semaphore: Optional[asyncio.Semaphore] = None
+
+# Pooled HTTP client for Logic App calls, started by the app lifespan
+LOGIC_APP_TIMEOUT_SECONDS = 2.0
+_logic_app_client: Optional[httpx.AsyncClient] = None
+
+# Random bytes for UUIDs, drawn from the OS in batches to save syscalls
+UUID_BATCH_SIZE = 1024
+_uuid_pool: Deque[bytes] = deque()
+# Forked children must not hand out the parent's remaining UUIDs (POSIX only)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_uuid_pool.clear)
+
 
 def validate_file_type(file: UploadFile) -> str:
     """
@@ -79,6 +107,68 @@ def generate_thumbnail(image_data: bytes, max_size: tuple = (300, 300)) -> Optio
         return None
 
 
+def start_thumbnail_executor() -> None:
+    """Start the process pool used for thumbnail generation"""
+    global _thumbnail_executor
+    if _thumbnail_executor is None:
+        # Forking a threaded process can deadlock the child, so workers come
+        # from a single-threaded forkserver with this module preloaded, or
+        # are spawned where forkserver is unavailable (Windows)
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("forkserver")
+            mp_context.set_forkserver_preload([__name__])
+        else:
+            mp_context = multiprocessing.get_context("spawn")
+        _thumbnail_executor = ProcessPoolExecutor(
+            max_workers=settings.thumbnail_workers, mp_context=mp_context
+        )
+
+
+def shutdown_thumbnail_executor() -> None:
+    """Shut down the thumbnail process pool"""
+    global _thumbnail_executor
+    if _thumbnail_executor is not None:
+        # Don't block the event loop waiting for workers to exit
+        _thumbnail_executor.shutdown(wait=False, cancel_futures=True)
+        _thumbnail_executor = None
+
+
+async def generate_thumbnail_async(image_data: bytes) -> Optional[bytes]:
+    """
+    Generate thumbnail off the event loop
+    Falls back to the default thread pool if the process pool is not started
+    """
+    global _thumbnail_executor
+    executor = _thumbnail_executor
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(executor, generate_thumbnail, image_data)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM); replace the pool so later uploads recover
+        if executor is not None and _thumbnail_executor is executor:
+            logger.warning("Thumbnail process pool is broken, restarting it")
+            executor.shutdown(wait=False)
+            _thumbnail_executor = None
+            start_thumbnail_executor()
+        raise
+
+
+def generate_uuid() -> str:
+    """Random (version 4) UUID string backed by a pre-generated batch"""
+    try:
+        raw = _uuid_pool.popleft()
+    except IndexError:
+        batch = secrets.token_bytes(16 * UUID_BATCH_SIZE)
+        _uuid_pool.extend(batch[i : i + 16] for i in range(16, len(batch), 16))
+        raw = batch[:16]
+    return str(uuid.UUID(bytes=raw, version=4))
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as an ISO 8601 string, computed once per write"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human-readable format"""
     for unit in ["B", "KB", "MB", "GB"]:
@@ -88,14 +178,38 @@ def format_file_size(size_bytes: int) -> str:
     return f"{size_bytes:.2f} TB"
 
 
+def start_logic_app_client() -> None:
+    """Create the shared HTTP client used for Logic App notifications"""
+    global _logic_app_client
+    if _logic_app_client is None:
+        _logic_app_client = httpx.AsyncClient(
+            http2=True,
+            timeout=LOGIC_APP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=50),
+        )
+
+
+async def close_logic_app_client() -> None:
+    """Close the shared Logic App HTTP client"""
+    global _logic_app_client
+    if _logic_app_client is not None:
+        await _logic_app_client.aclose()
+        _logic_app_client = None
+
+
 async def notify_logic_app() -> None:
     """
     Send notification to Logic App URL with default values
     """
+    global _notification_semaphore
+
     if not settings.logic_app_url:
         logger.warning("LOGIC_APP_URL is not configured, skipping notification")
         return
 
+    if _notification_semaphore is None:
+        _notification_semaphore = asyncio.Semaphore(MAX_CONCURRENT_NOTIFICATIONS)
+
     try:
         payload = {
             "type": "",
@@ -103,11 +217,24 @@ async def notify_logic_app() -> None:
             "filename": ""
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(settings.logic_app_url, json=payload)
+        start_logic_app_client()
+
+        async with _notification_semaphore:
+            response = await _logic_app_client.post(
+                settings.logic_app_url, json=payload
+            )
             response.raise_for_status()
             logger.info("Successfully notified Logic App")
 
     except Exception as e:
         # Log error but don't raise - this is a background notification
         logger.error(f"Failed to notify Logic App: {e}")
+
+
+def schedule_logic_app_notification() -> None:
+    """
+    Notify Logic App in the background without delaying the response
+    """
+    task = asyncio.create_task(notify_logic_app())
+    _pending_notifications.add(task)
+    task.add_done_callback(_pending_notifications.discard)